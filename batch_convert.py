@@ -0,0 +1,69 @@
+#!/usr/bin/env python3
+"""
+Convert a Direct Publisher feed with independent worker processes.
+
+Thin orchestrator over the batch pipeline:
+  1. prepare_batch.py flattens the feed to roku_batch.jsonl
+  2. the file is split into equal byte ranges, one worker.py per range
+  3. merge.py wraps the shard outputs in the Search Feed root
+
+Workers are separate processes (they could equally run on other hosts
+against a shared file), so a failed worker only loses its own range; the
+failed ranges are reported with the command to rerun them.
+
+Usage: python batch_convert.py [workers]
+"""
+
+import os
+import shlex
+import subprocess
+import sys
+
+from merge import merge
+from prepare_batch import prepare_batch
+
+WORKER = os.path.join(os.path.dirname(os.path.abspath(__file__)), "worker.py")
+
+
+def main():
+    input_file = "roku_feed.json"
+    output_file = "roku_search_feed.json"
+    batch_file = "roku_batch.jsonl"
+
+    workers = os.cpu_count() or 1
+    if len(sys.argv) > 1:
+        workers = int(sys.argv[1]) if sys.argv[1].isdigit() else 0
+        if workers < 1:
+            print(__doc__.strip().splitlines()[-1], file=sys.stderr)
+            sys.exit(2)
+
+    count, size = prepare_batch(input_file, batch_file)
+    print(f"Batch: {count} items, {size:,} bytes -> {workers} workers")
+
+    bounds = [size * i // workers for i in range(workers + 1)]
+    jobs = []
+    for i in range(workers):
+        shard_file = f"roku_batch.{i}.jsonl"
+        cmd = [sys.executable, WORKER, batch_file, shard_file,
+               "--start-byte", str(bounds[i]), "--end-byte", str(bounds[i + 1])]
+        jobs.append((shard_file, cmd, subprocess.Popen(cmd)))
+
+    failed = [(shard_file, cmd) for shard_file, cmd, proc in jobs if proc.wait() != 0]
+    if failed:
+        print(f"\n{len(failed)} worker(s) failed; rerun them, then merge.py:", file=sys.stderr)
+        for _, cmd in failed:
+            print("  " + shlex.join(cmd), file=sys.stderr)
+        sys.exit(1)
+
+    total, out_size = merge([shard_file for shard_file, _, _ in jobs], output_file)
+    print(f"\nSearch feed written to {output_file}")
+    print(f"Total assets: {total}")
+    print(f"File size: {out_size / 1024 / 1024:.1f} MB")
+
+    for shard_file, _, _ in jobs:
+        os.remove(shard_file)
+    os.remove(batch_file)
+
+
+if __name__ == "__main__":
+    main()
@@ -14,254 +14,259 @@ Key differences from Direct Publisher:
 - Country codes are lowercase
 """
 
-import json
+import os
 import sys
-
-# Valid Roku Search Feed genres (from spec)
-VALID_GENRES = {
-    "action", "action sports", "adventure", "aerobics", "agriculture", "animals",
-    "animated", "anime", "anthology", "archery", "arm wrestling", "art", "arts/crafts",
-    "artistic gymnastics", "artistic swimming", "athletics", "auction", "auto",
-    "auto racing", "aviation", "awards", "badminton", "ballet", "baseball",
-    "basketball", "3x3 basketball", "beach soccer", "beach volleyball", "biathlon",
-    "bicycle", "bicycle racing", "billiards", "biography", "blackjack", "bmx racing",
-    "boat", "boat racing", "bobsled", "bodybuilding", "bowling", "boxing",
-    "bullfighting", "bus./financial", "canoe", "card games", "ceremony", "cheerleading",
-    "children", "children-music", "children-special", "children-talk", "collectibles",
-    "comedy", "comedy drama", "community", "computers", "canoe/kayak", "consumer",
-    "cooking", "cricket", "crime", "crime drama", "curling", "cycling", "dance",
-    "dark comedy", "darts", "debate", "diving", "docudrama", "documentary",
-    "dog racing", "dog show", "dog sled", "drag racing", "drama", "educational",
-    "entertainment", "environment", "equestrian", "erotic", "event", "exercise",
-    "fantasy", "faith", "fashion", "fencing", "field hockey", "figure skating",
-    "fishing", "football", "food", "fundraiser", "gaelic football", "game show",
-    "gaming", "gay/lesbian", "golf", "gymnastics", "handball", "health",
-    "historical drama", "history", "hockey", "holiday", "holiday music",
-    "holiday music special", "holiday special", "holiday-children",
-    "holiday-children special", "home improvement", "horror", "horse", "house/garden",
-    "how-to", "hunting", "hurling", "hydroplane racing", "indoor soccer", "interview",
-    "intl soccer", "judo", "karate", "kayaking", "lacrosse", "law", "live", "luge",
-    "martial arts", "medical", "military", "miniseries", "mixed martial arts",
-    "modern pentathlon", "motorcycle", "motorcycle racing", "motorsports",
-    "mountain biking", "music", "music special", "music talk", "musical",
-    "musical comedy", "mystery", "nature", "news", "newsmagazine", "olympics",
-    "opera", "outdoors", "parade", "paranormal", "parenting", "performing arts",
-    "playoff sports", "poker", "politics", "polo", "pool", "pro wrestling",
-    "public affairs", "racquet", "reality", "religious", "ringuette", "road cycling",
-    "rodeo", "roller derby", "romance", "romantic comedy", "rowing", "rugby",
-    "running", "rhythmic gymnastics", "sailing", "science", "science fiction",
-    "self improvement", "shooting", "shopping", "sitcom", "skateboarding", "skating",
-    "skeleton", "skiing", "snooker", "snowboarding", "snowmobile", "soap",
-    "soap special", "soap talk", "soccer", "softball", "special", "speed skating",
-    "sport climbing", "sports", "sports talk", "squash", "standup", "sumo wrestling",
-    "surfing", "suspense", "swimming", "table tennis", "taekwondo", "talk",
-    "technology", "tennis", "theater", "thriller", "track/field", "track cycling",
-    "travel", "trampoline", "triathlon", "variety", "volleyball", "war", "water polo",
-    "water skiing", "watersports", "weather", "weightlifting", "western", "wrestling",
-    "yacht racing"
+from collections import Counter
+from functools import partial
+
+from feed_io import dumps, parallel_map, read_feed, write_feed
+from genres import VALID_GENRES
+
+_ELLIPSIS = "..."
+
+# Language list shared by every title/description; encoders emit tuples as arrays
+_LANG_EN = ("en",)
+
+# Direct Publisher → Search Feed value maps, shared by every item
+_QUALITY_MAP = {
+    "HD": "hd",
+    "SD": "sd",
+    "UHD": "uhd",
+    "FHD": "fhd",
+    # Already-lowercase values map straight through without an .upper()
+    "hd": "hd",
+    "sd": "sd",
+    "uhd": "uhd",
+    "fhd": "fhd"
+}
+_SOURCE_MAP = {
+    "USA_TV": "USA_PR",
+    "MPAA": "MPAA",
+    "USA_PR": "USA_PR"
 }
 
+# Default rating required when the item has none (never mutated)
+_DEFAULT_RATING = ({"source": "USA_PR", "value": "TV-G"},)
+
+# Validation flags returned alongside each converted asset
+MISSING_IMAGE = 1
+MISSING_DURATION = 2
+LONG_TITLE = 4
+LONG_SHORT_DESC = 8
+
 
 def truncate(text, max_len):
     """Truncate text to max_len characters."""
-    if not text:
-        return text
-    if len(text) <= max_len:
+    if not text or len(text) <= max_len:
         return text
-    return text[:max_len - 3] + "..."
+    return text[:max_len - 3] + _ELLIPSIS
 
 
 def validate_genres(genres):
     """Return only valid genres; default to ['special'] if none valid."""
-    valid = [g for g in genres if g.lower() in VALID_GENRES]
-    # Return lowercase to match spec
-    if not valid:
-        return ["special"]
-    return [g.lower() for g in valid]
+    # Feeds usually carry canonical lowercase genres already; skip lower() then
+    if genres and all(g in VALID_GENRES for g in genres):
+        return list(genres)
+    # Lowercase each genre once; spec values are lowercase
+    valid = [g for g in (x.lower() for x in genres) if g in VALID_GENRES]
+    return valid or ["special"]
 
 
 def convert_item(item, item_type):
-    """Convert a Direct Publisher item to Search Feed asset."""
+    """Convert a Direct Publisher item to a Search Feed asset.
+
+    Returns (asset, flags), where flags is a bitmask of the validation
+    problems (MISSING_IMAGE, MISSING_DURATION, ...) found on the asset.
+    """
+    flags = 0
     title = truncate(item.get("title", "Untitled"), 200)
     short_desc = truncate(item.get("shortDescription", title), 200)
     long_desc = truncate(item.get("longDescription", ""), 500)
 
-    asset = {
-        "id": item["id"][:50],  # Max 50 chars
-        "type": item_type,
-        "titles": [{"value": title, "languages": ["en"]}],
-        "shortDescriptions": [{"value": short_desc, "languages": ["en"]}],
-        "releaseDate": item.get("releaseDate", "2025-01-01"),
-        "genres": validate_genres(item.get("genres", ["special"])),
-        "advisoryRatings": [],
-        "images": [],
-        "content": {
-            "playOptions": []
-        }
-    }
-
-    # Long description (optional, only if non-empty)
-    if long_desc:
-        asset["longDescriptions"] = [{"value": long_desc, "languages": ["en"]}]
-
     # Rating conversion: Direct Publisher → Search Feed
     rating = item.get("rating", {})
     if rating:
-        # Map rating source
-        source_map = {
-            "USA_TV": "USA_PR",
-            "MPAA": "MPAA",
-            "USA_PR": "USA_PR"
-        }
-        source = source_map.get(rating.get("ratingSource", "USA_TV"), "USA_PR")
+        # Map rating source; a missing source falls through to USA_PR,
+        # which is what the old USA_TV default mapped to anyway
+        source = _SOURCE_MAP.get(rating.get("ratingSource"), "USA_PR")
 
         # Map rating value (spec accepts both "TV-G" and "TVG" forms)
         value = rating.get("rating", "TV-G")
-        asset["advisoryRatings"] = [{"source": source, "value": value}]
+        ratings = [{"source": source, "value": value}]
     else:
         # Default rating required
-        asset["advisoryRatings"] = [{"source": "USA_PR", "value": "TV-G"}]
+        ratings = list(_DEFAULT_RATING)
 
     # Thumbnail → image with type "main" (spec requires "main" or "background")
     if item.get("thumbnail"):
-        asset["images"] = [{"type": "main", "url": item["thumbnail"]}]
+        images = [{"type": "main", "url": item["thumbnail"]}]
+    else:
+        images = []
+        flags |= MISSING_IMAGE
 
     # Content/videos → playOptions
     content = item.get("content", {})
+    play_options = []
     if content.get("videos"):
         for vid in content["videos"]:
-            quality_map = {
-                "HD": "hd",
-                "SD": "sd",
-                "UHD": "uhd",
-                "FHD": "fhd"
-            }
-            play_option = {
-                "license": "free",
-                "quality": quality_map.get(vid.get("quality", "HD").upper(), "hd")
-            }
+            # Mixed-case qualities miss the map and fall back to .upper()
+            quality = vid.get("quality", "HD")
+            quality = _QUALITY_MAP.get(quality) or _QUALITY_MAP.get(quality.upper(), "hd")
             # Extract playId from proxy URL
             url = vid.get("url", "")
-            if "/play/" in url:
-                play_id = url.split("/play/")[-1]
-                play_option["playId"] = play_id
-            else:
-                play_option["playId"] = item["id"]
-            asset["content"]["playOptions"].append(play_option)
+            play_options.append({
+                "license": "free",
+                "quality": quality,
+                "playId": url.split("/play/")[-1] if "/play/" in url else item["id"]
+            })
 
     # Ensure at least one playOption exists
-    if not asset["content"]["playOptions"]:
-        asset["content"]["playOptions"] = [{
+    if not play_options:
+        play_options = [{
             "license": "free",
             "quality": "hd",
             "playId": item["id"]
         }]
 
-    # Duration (required for non-series/season)
-    if content.get("duration"):
-        asset["durationInSeconds"] = content["duration"]
-    else:
-        # Default 60 seconds if missing
-        asset["durationInSeconds"] = 60
+    # Build the asset in one go rather than filling in empty placeholders
+    asset = {
+        "id": item["id"][:50],  # Max 50 chars
+        "type": item_type,
+        "titles": [{"value": title, "languages": _LANG_EN}],
+        "shortDescriptions": [{"value": short_desc, "languages": _LANG_EN}],
+        "releaseDate": item.get("releaseDate", "2025-01-01"),
+        "genres": validate_genres(item.get("genres", ["special"])),
+        "advisoryRatings": ratings,
+        "images": images,
+        "content": {
+            "playOptions": play_options
+        }
+    }
+
+    # Long description (optional, only if non-empty)
+    if long_desc:
+        asset["longDescriptions"] = [{"value": long_desc, "languages": _LANG_EN}]
+
+    # Duration (required for non-series/season); default 60 seconds if missing
+    asset["durationInSeconds"] = content.get("duration") or 60
 
     # Tags (each max 20 chars)
     if item.get("tags"):
-        clean_tags = [t.strip('"').strip()[:20] for t in item["tags"] if t.strip('"').strip()]
+        clean_tags = []
+        for t in item["tags"]:
+            t = t.strip('"').strip()
+            if t:
+                clean_tags.append(t if len(t) <= 20 else t[:20])
         if clean_tags:
             asset["tags"] = clean_tags
 
-    return asset
+    if not asset["durationInSeconds"]:
+        flags |= MISSING_DURATION
+    if title and len(title) > 200:
+        flags |= LONG_TITLE
+    if short_desc and len(short_desc) > 200:
+        flags |= LONG_SHORT_DESC
+
+    return asset, flags
+
+
+def try_convert_item(item, item_type):
+    """Return (asset, flags, None), or (None, 0, "<id>: <error>") if conversion fails."""
+    try:
+        return convert_item(item, item_type) + (None,)
+    except Exception as e:
+        return None, 0, f"{item.get('id', '?')}: {e}"
+
+
+def convert_all(movies, shortforms, stats, samples, workers=1):
+    """Yield converted assets, tallying errors and validation counts as they stream past."""
+    id_counts = Counter()
+    flag_counts = Counter()
+    for item_type, items in (("movie", movies), ("shortform", shortforms)):
+        results = parallel_map(partial(try_convert_item, item_type=item_type), items, workers)
+        for a, flags, e in results:
+            stats[item_type] += 1
+            if e is not None:
+                print(f"  ERROR {item_type} {e}", file=sys.stderr)
+                stats["errors"] += 1
+                continue
+
+            id_counts[a["id"]] += 1
+            flag_counts[flags] += 1
+
+            # Keep the first asset of each type for the sample printout
+            if item_type not in samples:
+                samples[item_type] = a
+            yield a
+
+    stats["dupes"] = sum(n - 1 for n in id_counts.values())
+    for flags, n in flag_counts.items():
+        if flags & MISSING_IMAGE:
+            stats["missing_images"] += n
+        if flags & MISSING_DURATION:
+            stats["missing_duration"] += n
+        if flags & LONG_TITLE:
+            stats["long_titles"] += n
+        if flags & LONG_SHORT_DESC:
+            stats["long_short_desc"] += n
 
 
 def main():
     input_file = "roku_feed.json"
     output_file = "roku_search_feed.json"
 
-    with open(input_file, "r") as f:
-        dp_feed = json.load(f)
-
-    print(f"Provider: {dp_feed.get('providerName', 'Unknown')}")
-    movies = dp_feed.get("movies", [])
-    shortforms = dp_feed.get("shortFormVideos", [])
-    print(f"Movies: {len(movies)}")
-    print(f"Short Form Videos: {len(shortforms)}")
-
-    assets = []
-    errors = 0
-
-    # Convert movies
-    for movie in movies:
-        try:
-            assets.append(convert_item(movie, "movie"))
-        except Exception as e:
-            print(f"  ERROR movie {movie.get('id', '?')}: {e}", file=sys.stderr)
-            errors += 1
-
-    # Convert short form videos
-    for sf in shortforms:
-        try:
-            assets.append(convert_item(sf, "shortform"))
-        except Exception as e:
-            print(f"  ERROR shortform {sf.get('id', '?')}: {e}", file=sys.stderr)
-            errors += 1
+    # --jsonl writes one asset per line instead of a single Search Feed document
+    jsonl = "--jsonl" in sys.argv[1:]
+    if jsonl:
+        output_file = "roku_search_feed.jsonl"
+
+    # --parallel converts across a process pool (one worker per core); it only
+    # pays off for feeds far larger than the bundled one
+    workers = (os.cpu_count() or 1) if "--parallel" in sys.argv[1:] else 1
+
+    # Movies and short form videos are streamed from the input when ijson is available
+    fields, (movies, shortforms) = read_feed(input_file, ["providerName"],
+                                             ["movies", "shortFormVideos"])
+
+    print(f"Provider: {fields['providerName'] or 'Unknown'}")
+
+    stats = Counter()
+    samples = {}
 
     # Build search feed with lowercase country codes per spec
-    search_feed = {
+    header = {
         "version": "1",
         "defaultLanguage": "en",
         "defaultAvailabilityCountries": ["us"],
-        "assets": assets
     }
 
-    with open(output_file, "w") as f:
-        json.dump(search_feed, f, indent=2)
-
-    file_size = len(json.dumps(search_feed))
+    # Assets are encoded and written one at a time as they are converted
+    total, file_size = write_feed(output_file, header,
+                                  convert_all(movies, shortforms, stats, samples, workers),
+                                  jsonl=jsonl)
+    print(f"Movies: {stats['movie']}")
+    print(f"Short Form Videos: {stats['shortform']}")
     print(f"\nSearch feed written to {output_file}")
-    print(f"Total assets: {len(assets)}")
-    print(f"Errors: {errors}")
+    print(f"Total assets: {total}")
+    print(f"Errors: {stats['errors']}")
     print(f"File size: {file_size / 1024 / 1024:.1f} MB")
 
-    # Validation checks
+    # Validation checks (tallied during conversion)
     print("\n--- Validation ---")
-    id_set = set()
-    dupes = 0
-    missing_images = 0
-    missing_duration = 0
-    long_titles = 0
-    long_short_desc = 0
-
-    for a in assets:
-        if a["id"] in id_set:
-            dupes += 1
-        id_set.add(a["id"])
-        if not a.get("images"):
-            missing_images += 1
-        if not a.get("durationInSeconds"):
-            missing_duration += 1
-        for t in a.get("titles", []):
-            if len(t["value"]) > 200:
-                long_titles += 1
-        for d in a.get("shortDescriptions", []):
-            if len(d["value"]) > 200:
-                long_short_desc += 1
-
-    print(f"Duplicate IDs: {dupes}")
-    print(f"Missing images: {missing_images}")
-    print(f"Missing duration: {missing_duration}")
-    print(f"Titles > 200 chars: {long_titles}")
-    print(f"Short descs > 200 chars: {long_short_desc}")
+    print(f"Duplicate IDs: {stats['dupes']}")
+    print(f"Missing images: {stats['missing_images']}")
+    print(f"Missing duration: {stats['missing_duration']}")
+    print(f"Titles > 200 chars: {stats['long_titles']}")
+    print(f"Short descs > 200 chars: {stats['long_short_desc']}")
 
     # Print samples
     print("\n--- Sample Movie ---")
-    movie_assets = [a for a in assets if a["type"] == "movie"]
-    if movie_assets:
-        print(json.dumps(movie_assets[0], indent=2))
+    if "movie" in samples:
+        print(dumps(samples["movie"], indent=True).decode(), end="")
 
     print("\n--- Sample Shortform ---")
-    sf_assets = [a for a in assets if a["type"] == "shortform"]
-    if sf_assets:
-        print(json.dumps(sf_assets[0], indent=2))
+    if "shortform" in samples:
+        print(dumps(samples["shortform"], indent=True).decode(), end="")
 
 
 if __name__ == "__main__":
@@ -10,87 +10,95 @@ Asset: { id, type, titles[], shortDescriptions[], longDescriptions[], releaseDat
 """
 
 import json
+import os
 import sys
 import re
+from collections import Counter
+from functools import lru_cache, partial
+from json.encoder import encode_basestring_ascii as _json_str
 
-# Valid Roku genres (lowercase for matching)
-VALID_GENRES = {
-    "action", "action sports", "adventure", "aerobics", "agriculture", "animals",
-    "animated", "anime", "anthology", "archery", "arm wrestling", "art", "arts/crafts",
-    "artistic gymnastics", "artistic swimming", "athletics", "auction", "auto",
-    "auto racing", "aviation", "awards", "badminton", "ballet", "baseball",
-    "basketball", "3x3 basketball", "beach soccer", "beach volleyball", "biathlon",
-    "bicycle", "bicycle racing", "billiards", "biography", "blackjack", "bmx racing",
-    "boat", "boat racing", "bobsled", "bodybuilding", "bowling", "boxing",
-    "bullfighting", "bus./financial", "canoe", "card games", "ceremony",
-    "cheerleading", "children", "children-music", "children-special", "children-talk",
-    "collectibles", "comedy", "comedy drama", "community", "computers", "canoe/kayak",
-    "consumer", "cooking", "cricket", "crime", "crime drama", "curling", "cycling",
-    "dance", "dark comedy", "darts", "debate", "diving", "docudrama", "documentary",
-    "dog racing", "dog show", "dog sled", "drag racing", "drama", "educational",
-    "entertainment", "environment", "equestrian", "erotic", "event", "exercise",
-    "fantasy", "faith", "fashion", "fencing", "field hockey", "figure skating",
-    "fishing", "football", "food", "fundraiser", "gaelic football", "game show",
-    "gaming", "gay/lesbian", "golf", "gymnastics", "handball", "health",
-    "historical drama", "history", "hockey", "holiday", "holiday music",
-    "holiday music special", "holiday special", "holiday-children",
-    "holiday-children special", "home improvement", "horror", "horse", "house/garden",
-    "how-to", "hunting", "hurling", "hydroplane racing", "indoor soccer", "interview",
-    "intl soccer", "judo", "karate", "kayaking", "lacrosse", "law", "live", "luge",
-    "martial arts", "medical", "military", "miniseries", "mixed martial arts",
-    "modern pentathlon", "motorcycle", "motorcycle racing", "motorsports",
-    "mountain biking", "music", "music special", "music talk", "musical",
-    "musical comedy", "mystery", "nature", "news", "newsmagazine", "olympics",
-    "opera", "outdoors", "parade", "paranormal", "parenting", "performing arts",
-    "playoff sports", "poker", "politics", "polo", "pool", "pro wrestling",
-    "public affairs", "racquet", "reality", "religious", "ringuette", "road cycling",
-    "rodeo", "roller derby", "romance", "romantic comedy", "rowing", "rugby",
-    "running", "rhythmic gymnastics", "sailing", "science", "science fiction",
-    "self improvement", "shooting", "shopping", "sitcom", "skateboarding", "skating",
-    "skeleton", "skiing", "snooker", "snowboarding", "snowmobile", "soap",
-    "soap special", "soap talk", "soccer", "softball", "special", "speed skating",
-    "sport climbing", "sports", "sports talk", "squash", "standup", "sumo wrestling",
-    "surfing", "suspense", "swimming", "table tennis", "taekwondo", "talk",
-    "technology", "tennis", "theater", "thriller", "track/field", "track cycling",
-    "travel", "trampoline", "triathlon", "variety", "volleyball", "war",
-    "water polo", "water skiing", "watersports", "weather", "weightlifting",
-    "western", "wrestling", "yacht racing"
-}
+try:
+    import ahocorasick
+except ImportError:
+    ahocorasick = None
 
+from feed_io import JSON_BACKEND, parallel_map, read_feed, write_feed
 
-def classify_content(title, description, tags, duration_secs):
-    """Try to assign a valid Roku genre based on content analysis."""
-    text = f"{title} {description} {' '.join(tags)}".lower()
-    
+# Vimeo ID in proxy URLs (…/play/<digits>); only used when the fast path misses
+_PLAY_ID_RE = re.compile(r'/play/(\d+)')
+
+# Genre keywords, checked in priority order: the first genre with any hit wins
+_GENRE_KEYWORDS = [
     # Church/religious content
-    if any(w in text for w in ['church', 'sermon', 'bible', 'pastor', 'worship', 'prayer', 
-                                'gospel', 'praise', 'ministry', 'missionary', 'baptist',
-                                'pastoral', 'deacon', 'sunday', 'galilee', 'scripture',
-                                'christmas eve', 'easter', 'revival']):
-        return ["faith"]
-    
+    ("faith", ['church', 'sermon', 'bible', 'pastor', 'worship', 'prayer',
+               'gospel', 'praise', 'ministry', 'missionary', 'baptist',
+               'pastoral', 'deacon', 'sunday', 'galilee', 'scripture',
+               'christmas eve', 'easter', 'revival']),
     # Music content
-    if any(w in text for w in ['music', 'song', 'concert', 'singing', 'choir', 'hymn']):
-        return ["music"]
-    
+    ("music", ['music', 'song', 'concert', 'singing', 'choir', 'hymn']),
     # Holiday content
-    if any(w in text for w in ['christmas', 'holiday', 'thanksgiving', 'easter']):
-        return ["holiday"]
-    
+    ("holiday", ['christmas', 'holiday', 'thanksgiving', 'easter']),
     # News/talk
-    if any(w in text for w in ['news', 'interview', 'talk', 'discussion']):
-        return ["talk"]
-    
+    ("talk", ['news', 'interview', 'talk', 'discussion']),
     # Community
-    if any(w in text for w in ['community', 'neighborhood', 'local', 'event']):
-        return ["community"]
-    
+    ("community", ['community', 'neighborhood', 'local', 'event']),
     # Educational
-    if any(w in text for w in ['education', 'learn', 'class', 'lesson', 'tutorial']):
-        return ["educational"]
+    ("educational", ['education', 'learn', 'class', 'lesson', 'tutorial']),
+]
+
+if ahocorasick is not None:
+    # One automaton pass reports every keyword occurrence; each keyword maps
+    # to the index of the highest-priority genre that lists it
+    _KEYWORD_AUTOMATON = ahocorasick.Automaton()
+    for _prio, (_genre, _words) in enumerate(_GENRE_KEYWORDS):
+        for _w in _words:
+            if _w not in _KEYWORD_AUTOMATON:
+                _KEYWORD_AUTOMATON.add_word(_w, _prio)
+    _KEYWORD_AUTOMATON.make_automaton()
+
+    def _genre_index(texts):
+        best = len(_GENRE_KEYWORDS)
+        for text in texts:
+            for _, prio in _KEYWORD_AUTOMATON.iter(text):
+                if prio < best:
+                    best = prio
+                    if best == 0:
+                        return best
+        return best
+else:
+    # Without pyahocorasick, per-genre substring scans beat a combined regex
+    def _genre_index(texts):
+        for prio, (_, words) in enumerate(_GENRE_KEYWORDS):
+            if any(w in text for text in texts for w in words):
+                return prio
+        return len(_GENRE_KEYWORDS)
+
+
+def _cap(text, max_len):
+    """Cap text at max_len characters, returning it untouched when it already fits."""
+    return text if len(text) <= max_len else text[:max_len]
+
+
+@lru_cache(maxsize=8192)
+def _classify_cached(title, description, tags):
+    """Return the genre for a (title, description, tags tuple) key."""
+    # Scan each source on its own rather than concatenating them first
+    texts = [title.lower(), description.lower()]
+    texts.extend(t.lower() for t in tags)
+    
+    prio = _genre_index(texts)
+    if prio < len(_GENRE_KEYWORDS):
+        return _GENRE_KEYWORDS[prio][0]
     
     # Default for religious org content
-    return ["faith"]
+    return "faith"
+
+
+def classify_content(title, description, tags, duration_secs):
+    """Try to assign a valid Roku genre based on content analysis."""
+    # Feeds repeat titles/descriptions heavily (weekly services etc.), so the
+    # keyword scan is memoized; duration does not affect the result
+    return [_classify_cached(title, description, tuple(tags))]
 
 
 def convert_item(item, item_type):
@@ -101,10 +109,14 @@ def convert_item(item, item_type):
     play_id = item["id"]
     if "content" in item and "videos" in item["content"] and item["content"]["videos"]:
         video_url = item["content"]["videos"][0].get("url", "")
-        # Extract vimeo ID from proxy URL
-        match = re.search(r'/play/(\d+)', video_url)
-        if match:
-            play_id = match.group(1)
+        # Extract vimeo ID from proxy URL; plain "…/play/<digits>" URLs skip the regex
+        _, sep, tail = video_url.partition('/play/')
+        if sep and tail.isdecimal():
+            play_id = tail
+        else:
+            match = _PLAY_ID_RE.search(video_url)
+            if match:
+                play_id = match.group(1)
     
     # Duration
     duration = item.get("content", {}).get("duration", 0)
@@ -122,19 +134,23 @@ def convert_item(item, item_type):
             asset_type = "shortform"
     
     # Title (max 200 chars)
-    title = (item.get("title", "") or "Untitled")[:200]
+    title = _cap(item.get("title", "") or "Untitled", 200)
     
     # Short description (max 200 chars)
-    short_desc = (item.get("shortDescription", "") or title)[:200]
+    short_desc = _cap(item.get("shortDescription", "") or title, 200)
     
     # Long description (max 500 chars)
-    long_desc = (item.get("longDescription", "") or short_desc)[:500]
+    long_desc = _cap(item.get("longDescription", "") or short_desc, 500)
     
     # Genres - must be from Roku's approved list
     genres = classify_content(title, short_desc, item.get("tags", []), duration)
     
     # Tags (max 20 chars each)
-    tags = [t[:20] for t in item.get("tags", []) if t and len(t.strip()) > 0]
+    tags = []
+    for t in item.get("tags", []):
+        t = t and t.strip()
+        if t:
+            tags.append(_cap(t, 20))
     
     # Thumbnail as main image
     thumbnail = item.get("thumbnail", "")
@@ -176,50 +192,98 @@ def convert_item(item, item_type):
     return asset
 
 
+def _json_value(value):
+    """Encode one JSON value, using the C string escaper for plain strings."""
+    if type(value) is str:
+        return _json_str(value)
+    return json.dumps(value, separators=(",", ":"))
+
+
+def encode_asset(asset):
+    """Encode an asset built by convert_item as compact JSON bytes.
+
+    convert_item always produces the same shape, so keys and punctuation
+    are emitted as literals; every value is read from the asset and escaped.
+    Keep the shape in step with convert_item. Only used on the stdlib json
+    backend: it is ~2x faster than json.dumps but ~2x slower than orjson.
+    """
+    rating = asset["advisoryRatings"][0]
+    images = asset["images"]
+    play = asset["content"]["playOptions"][0]
+    return "".join((
+        '{"id":', _json_value(asset["id"]),
+        ',"type":', _json_value(asset["type"]),
+        ',"titles":[{"value":', _json_value(asset["titles"][0]["value"]),
+        '}],"shortDescriptions":[{"value":', _json_value(asset["shortDescriptions"][0]["value"]),
+        '}],"longDescriptions":[{"value":', _json_value(asset["longDescriptions"][0]["value"]),
+        '}],"releaseDate":', _json_value(asset["releaseDate"]),
+        ',"genres":[', ",".join(map(_json_value, asset["genres"])),
+        '],"tags":[', ",".join(map(_json_value, asset["tags"])),
+        '],"advisoryRatings":[{"source":', _json_value(rating["source"]),
+        ',"value":', _json_value(rating["value"]),
+        '}],"images":[',
+        '{"type":%s,"url":%s}' % (_json_value(images[0]["type"]), _json_value(images[0]["url"]))
+        if images else "",
+        '],"durationInSeconds":', _json_value(asset["durationInSeconds"]),
+        ',"content":{"playOptions":[{"license":', _json_value(play["license"]),
+        ',"quality":', _json_value(play["quality"]),
+        ',"playId":', _json_value(play["playId"]),
+        '}]}}',
+    )).encode("ascii")
+
+
+def convert_all(movies, shorts, stats, workers=1):
+    """Yield converted assets for movies then short form videos, counting each type."""
+    for item_type, items in (("movie", movies), ("shortform", shorts)):
+        for asset in parallel_map(partial(convert_item, item_type=item_type), items, workers):
+            stats[item_type] += 1
+            yield asset
+
+
 def main():
     input_file = "roku_feed.json"
     output_file = "roku_feed.json"
     
-    if len(sys.argv) > 1:
-        input_file = sys.argv[1]
-    if len(sys.argv) > 2:
-        output_file = sys.argv[2]
+    # --jsonl writes one asset per line instead of a single Search Feed document
+    jsonl = "--jsonl" in sys.argv[1:]
+    args = [a for a in sys.argv[1:] if a not in ("--jsonl", "--parallel")]
+    if jsonl:
+        output_file = "roku_search_feed.jsonl"
+    
+    # --parallel converts across a process pool (one worker per core); it only
+    # pays off for feeds far larger than the bundled one
+    workers = (os.cpu_count() or 1) if "--parallel" in sys.argv[1:] else 1
+    
+    if len(args) > 0:
+        input_file = args[0]
+    if len(args) > 1:
+        output_file = args[1]
     
     print(f"Reading {input_file}...")
-    with open(input_file, 'r') as f:
-        data = json.load(f)
-    
-    assets = []
-    
-    # Convert movies
-    movies = data.get("movies", [])
-    print(f"Converting {len(movies)} movies...")
-    for item in movies:
-        asset = convert_item(item, "movie")
-        assets.append(asset)
-    
-    # Convert short form videos
-    shorts = data.get("shortFormVideos", [])
-    print(f"Converting {len(shorts)} short form videos...")
-    for item in shorts:
-        asset = convert_item(item, "shortform")
-        assets.append(asset)
-    
-    # Build Search Feed
-    search_feed = {
+    # Items are streamed from the input when ijson is available; the output
+    # only replaces the file once they have all been read
+    _, (movies, shorts) = read_feed(input_file, [], ["movies", "shortFormVideos"])
+    print("Converting movies and short form videos...")
+    stats = Counter()
+    
+    # Search Feed root; assets are streamed in after it
+    header = {
         "version": "1",
         "defaultLanguage": "en",
         "defaultAvailabilityCountries": ["us"],
-        "assets": assets
     }
     
-    print(f"Total assets: {len(assets)}")
-    print(f"Writing {output_file}...")
+    # orjson/ujson beat the fixed-shape encoder; it only pays off over stdlib json
+    encode = encode_asset if JSON_BACKEND == "json" else None
     
-    with open(output_file, 'w') as f:
-        json.dump(search_feed, f, indent=2)
+    print(f"Writing {output_file}...")
+    total, size = write_feed(output_file, header, convert_all(movies, shorts, stats, workers),
+                             jsonl=jsonl, encode=encode)
     
-    size = len(json.dumps(search_feed))
+    # Counts are only known once the (possibly streamed) input is consumed
+    print(f"Converted {stats['movie']} movies")
+    print(f"Converted {stats['shortform']} short form videos")
+    print(f"Total assets: {total}")
     print(f"Feed size: {size:,} bytes ({size/1024/1024:.1f} MB)")
     print("Done!")
 
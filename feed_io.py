@@ -0,0 +1,194 @@
+#!/usr/bin/env python3
+"""
+JSON encode/decode and conversion helpers shared by the feed converters.
+
+Prefers orjson (C/SIMD serializer, works on bytes directly), then ujson,
+then the stdlib json module, so the scripts still run on a bare Python.
+All encoders here return UTF-8 bytes so callers can write them once in
+binary mode and reuse the length for size reporting.
+"""
+
+import os
+import tempfile
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from itertools import islice
+
+try:
+    import ijson
+except ImportError:
+    ijson = None
+
+# Items per pool task when the input length is unknown (streamed input)
+PARALLEL_CHUNK_ITEMS = 256
+
+# Encoded assets are collected in memory and written out in chunks this big
+WRITE_CHUNK_BYTES = 1 << 20
+
+# Temp files are created 0600; finished feeds get the usual umask-based mode
+_UMASK = os.umask(0)
+os.umask(_UMASK)
+
+try:
+    import orjson
+
+    JSON_BACKEND = "orjson"
+
+    def dumps(obj, indent=False):
+        """Serialize obj to JSON bytes (2-space indent if requested)."""
+        option = orjson.OPT_INDENT_2 | orjson.OPT_APPEND_NEWLINE if indent else 0
+        return orjson.dumps(obj, option=option)
+
+    loads = orjson.loads
+
+except ImportError:
+    try:
+        import ujson
+
+        JSON_BACKEND = "ujson"
+
+        def dumps(obj, indent=False):
+            """Serialize obj to JSON bytes (2-space indent if requested)."""
+            text = ujson.dumps(obj, indent=2 if indent else 0,
+                               ensure_ascii=False, escape_forward_slashes=False)
+            return (text + "\n" if indent else text).encode("utf-8")
+
+        loads = ujson.loads
+
+    except ImportError:
+        import json
+
+        JSON_BACKEND = "json"
+
+        def dumps(obj, indent=False):
+            """Serialize obj to JSON bytes (2-space indent if requested)."""
+            if indent:
+                return (json.dumps(obj, indent=2) + "\n").encode("utf-8")
+            return json.dumps(obj, separators=(",", ":")).encode("utf-8")
+
+        loads = json.loads
+
+
+def _map_chunk(fn, chunk):
+    return [fn(item) for item in chunk]
+
+
+def parallel_map(fn, items, workers=1):
+    """Yield fn(item) for each item in order, optionally across a process pool.
+
+    Serial unless workers >= 2: on the bundled feed, pool start-up plus the
+    parent's pickling of chunks costs more than converting every item in
+    the parent, so the pool is opt-in (--parallel) rather than the default.
+    items may be a list or any iterator (e.g. a streamed feed array); it is
+    consumed a chunk at a time with a bounded number of chunks in flight,
+    so an iterator is never materialized in full.
+    fn must be picklable (a module-level function or a functools.partial of one).
+    """
+    if workers < 2:
+        yield from map(fn, items)
+        return
+    if hasattr(items, "__len__"):
+        # A few chunks per worker amortizes IPC while keeping the load balanced
+        chunksize = max(1, len(items) // (4 * workers))
+    else:
+        chunksize = PARALLEL_CHUNK_ITEMS
+    items = iter(items)
+    pending = deque()
+    with ProcessPoolExecutor(max_workers=workers) as ex:
+        while True:
+            chunk = list(islice(items, chunksize))
+            if not chunk:
+                break
+            pending.append(ex.submit(_map_chunk, fn, chunk))
+            if len(pending) >= 2 * workers:
+                yield from pending.popleft().result()
+        while pending:
+            yield from pending.popleft().result()
+
+
+def read_json(path):
+    """Load a JSON file without going through the text decode layer."""
+    with open(path, "rb") as f:
+        return loads(f.read())
+
+
+def _stream_array(path, key):
+    with open(path, "rb") as f:
+        yield from ijson.items(f, key + ".item", use_float=True)
+
+
+def read_feed(path, fields, arrays):
+    """Read a Direct Publisher feed as ({field: value}, [iterable per array key]).
+
+    With ijson installed each array is streamed from its own file handle,
+    so only one item is in memory at a time, and the top-level (scalar)
+    fields come from a separate event scan that stops once they have all
+    been seen. Otherwise the whole feed is loaded once.
+    """
+    if ijson is None:
+        feed = read_json(path)
+        return {k: feed.get(k) for k in fields}, [feed.get(k, []) for k in arrays]
+
+    values = {k: None for k in fields}
+    wanted = set(fields)
+    if wanted:
+        with open(path, "rb") as f:
+            for prefix, event, value in ijson.parse(f, use_float=True):
+                if prefix in wanted and event in ("string", "number", "boolean", "null"):
+                    values[prefix] = value
+                    wanted.discard(prefix)
+                    if not wanted:
+                        break
+    return values, [_stream_array(path, k) for k in arrays]
+
+
+def write_feed(path, header, assets, jsonl=False, encode=None):
+    """Stream assets to path one at a time; return (asset count, bytes written).
+
+    The feed is written as the header object with an "assets" array
+    appended, one asset per line, so only a single asset is ever encoded
+    in memory. With jsonl=True the header is dropped and each asset is
+    written as its own line for parallel post-processing.
+
+    The file only replaces path once the assets are exhausted; on error the
+    partial output is removed and path is left untouched.
+
+    Output is gathered in a bytearray and flushed every WRITE_CHUNK_BYTES,
+    so a large feed costs a handful of write calls rather than two per asset.
+    encode, if given, replaces dumps for the assets (it must return bytes).
+    """
+    encode = encode or dumps
+    count = 0
+    buf = bytearray()
+    if jsonl:
+        first, sep, tail = b"", b"\n", b"\n"
+    else:
+        head = dumps(header)[:-1]
+        first = head + (b',"assets":[\n' if header else b'"assets":[\n')
+        sep, tail = b",\n", b"\n]}\n"
+    # Write next to path and swap it in only once every asset is written, so
+    # a failure mid-stream never truncates an existing file (v2 writes over
+    # its own input by default)
+    f = tempfile.NamedTemporaryFile(dir=os.path.dirname(path) or ".", prefix=".tmp-",
+                                    delete=False, buffering=WRITE_CHUNK_BYTES)
+    try:
+        with f:
+            buf += first
+            for asset in assets:
+                if count:
+                    buf += sep
+                buf += encode(asset)
+                count += 1
+                if len(buf) >= WRITE_CHUNK_BYTES:
+                    f.write(buf)
+                    buf.clear()
+            if count or not jsonl:
+                buf += tail
+            f.write(buf)
+            size = f.tell()
+        os.chmod(f.name, 0o666 & ~_UMASK)
+        os.replace(f.name, path)
+    except BaseException:
+        os.unlink(f.name)
+        raise
+    return count, size
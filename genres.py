@@ -0,0 +1,51 @@
+#!/usr/bin/env python3
+"""
+Valid Roku Search Feed genres (from spec), shared by the feed converters.
+
+https://developer.roku.com/docs/specs/search/search-feed.md
+
+All entries are lowercase; callers lowercase input before matching.
+"""
+
+VALID_GENRES = frozenset({
+    "action", "action sports", "adventure", "aerobics", "agriculture", "animals",
+    "animated", "anime", "anthology", "archery", "arm wrestling", "art", "arts/crafts",
+    "artistic gymnastics", "artistic swimming", "athletics", "auction", "auto",
+    "auto racing", "aviation", "awards", "badminton", "ballet", "baseball",
+    "basketball", "3x3 basketball", "beach soccer", "beach volleyball", "biathlon",
+    "bicycle", "bicycle racing", "billiards", "biography", "blackjack", "bmx racing",
+    "boat", "boat racing", "bobsled", "bodybuilding", "bowling", "boxing",
+    "bullfighting", "bus./financial", "canoe", "card games", "ceremony", "cheerleading",
+    "children", "children-music", "children-special", "children-talk", "collectibles",
+    "comedy", "comedy drama", "community", "computers", "canoe/kayak", "consumer",
+    "cooking", "cricket", "crime", "crime drama", "curling", "cycling", "dance",
+    "dark comedy", "darts", "debate", "diving", "docudrama", "documentary",
+    "dog racing", "dog show", "dog sled", "drag racing", "drama", "educational",
+    "entertainment", "environment", "equestrian", "erotic", "event", "exercise",
+    "fantasy", "faith", "fashion", "fencing", "field hockey", "figure skating",
+    "fishing", "football", "food", "fundraiser", "gaelic football", "game show",
+    "gaming", "gay/lesbian", "golf", "gymnastics", "handball", "health",
+    "historical drama", "history", "hockey", "holiday", "holiday music",
+    "holiday music special", "holiday special", "holiday-children",
+    "holiday-children special", "home improvement", "horror", "horse", "house/garden",
+    "how-to", "hunting", "hurling", "hydroplane racing", "indoor soccer", "interview",
+    "intl soccer", "judo", "karate", "kayaking", "lacrosse", "law", "live", "luge",
+    "martial arts", "medical", "military", "miniseries", "mixed martial arts",
+    "modern pentathlon", "motorcycle", "motorcycle racing", "motorsports",
+    "mountain biking", "music", "music special", "music talk", "musical",
+    "musical comedy", "mystery", "nature", "news", "newsmagazine", "olympics",
+    "opera", "outdoors", "parade", "paranormal", "parenting", "performing arts",
+    "playoff sports", "poker", "politics", "polo", "pool", "pro wrestling",
+    "public affairs", "racquet", "reality", "religious", "ringuette", "road cycling",
+    "rodeo", "roller derby", "romance", "romantic comedy", "rowing", "rugby",
+    "running", "rhythmic gymnastics", "sailing", "science", "science fiction",
+    "self improvement", "shooting", "shopping", "sitcom", "skateboarding", "skating",
+    "skeleton", "skiing", "snooker", "snowboarding", "snowmobile", "soap",
+    "soap special", "soap talk", "soccer", "softball", "special", "speed skating",
+    "sport climbing", "sports", "sports talk", "squash", "standup", "sumo wrestling",
+    "surfing", "suspense", "swimming", "table tennis", "taekwondo", "talk",
+    "technology", "tennis", "theater", "thriller", "track/field", "track cycling",
+    "travel", "trampoline", "triathlon", "variety", "volleyball", "war", "water polo",
+    "water skiing", "watersports", "weather", "weightlifting", "western", "wrestling",
+    "yacht racing"
+})
@@ -0,0 +1,49 @@
+#!/usr/bin/env python3
+"""
+Merge worker.py shard files into a single Roku Search Feed.
+
+Shard lines are already-encoded assets, so they are copied through as
+bytes under the Search Feed root rather than parsed and re-encoded.
+
+Usage: python merge.py OUTPUT.json SHARD.jsonl [SHARD.jsonl ...]
+"""
+
+import sys
+
+from feed_io import write_feed
+
+
+def shard_lines(shard_files):
+    """Yield each non-empty asset line from the shards, in order."""
+    for path in shard_files:
+        with open(path, "rb") as f:
+            for line in f:
+                line = line.rstrip(b"\r\n")
+                if line:
+                    yield line
+
+
+def merge(shard_files, output_file):
+    """Write the merged feed; return (asset count, bytes written)."""
+    # Build search feed with lowercase country codes per spec
+    header = {
+        "version": "1",
+        "defaultLanguage": "en",
+        "defaultAvailabilityCountries": ["us"],
+    }
+    # Lines are written as-is; bytes() just passes them through as the encoder
+    return write_feed(output_file, header, shard_lines(shard_files), encode=bytes)
+
+
+def main():
+    if len(sys.argv) < 3:
+        print(__doc__.strip().splitlines()[-1], file=sys.stderr)
+        sys.exit(2)
+
+    output_file = sys.argv[1]
+    count, size = merge(sys.argv[2:], output_file)
+    print(f"Merged {count} assets into {output_file} ({size / 1024 / 1024:.1f} MB)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,43 @@
+#!/usr/bin/env python3
+"""
+Flatten a Direct Publisher feed into a JSONL batch file for worker.py.
+
+Each line is {"type": "movie" | "shortform", "item": {...}}, so the file
+can be split at arbitrary byte offsets and each range converted on its own.
+
+Usage: python prepare_batch.py [input.json] [output.jsonl]
+"""
+
+import sys
+
+from feed_io import read_feed, write_feed
+
+
+def batch_records(movies, shortforms):
+    """Yield one batch record per Direct Publisher item."""
+    for item_type, items in (("movie", movies), ("shortform", shortforms)):
+        for item in items:
+            yield {"type": item_type, "item": item}
+
+
+def prepare_batch(input_file, batch_file):
+    """Write the batch file; return (item count, bytes written)."""
+    _, (movies, shortforms) = read_feed(input_file, [], ["movies", "shortFormVideos"])
+    return write_feed(batch_file, None, batch_records(movies, shortforms), jsonl=True)
+
+
+def main():
+    input_file = "roku_feed.json"
+    batch_file = "roku_batch.jsonl"
+
+    if len(sys.argv) > 1:
+        input_file = sys.argv[1]
+    if len(sys.argv) > 2:
+        batch_file = sys.argv[2]
+
+    count, size = prepare_batch(input_file, batch_file)
+    print(f"Wrote {count} items to {batch_file} ({size:,} bytes)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,70 @@
+#!/usr/bin/env python3
+"""
+Convert one byte range of a prepare_batch.py JSONL file to Search Feed assets.
+
+A worker owns every line that starts inside [start-byte, end-byte), so
+ranges cut at arbitrary offsets cover each line exactly once. Converted
+assets are written one per line to the shard file for merge.py.
+
+Usage: python worker.py BATCH.jsonl SHARD.jsonl [--start-byte N] [--end-byte N]
+"""
+
+import argparse
+import os
+import sys
+
+from convert_to_search_feed import try_convert_item
+from feed_io import loads, write_feed
+
+
+def iter_range(path, start, end):
+    """Yield the lines of path that start at a byte offset in [start, end)."""
+    with open(path, "rb") as f:
+        if start:
+            # The line straddling start belongs to the previous range
+            f.seek(start - 1)
+            f.readline()
+        while f.tell() < end:
+            line = f.readline()
+            if not line:
+                break
+            yield line
+
+
+def convert_range(batch_file, start, end, stats):
+    """Yield converted assets for the batch records in [start, end)."""
+    for line in iter_range(batch_file, start, end):
+        if not line.strip():
+            continue
+        record = loads(line)
+        stats["items"] += 1
+        asset, _, e = try_convert_item(record["item"], record["type"])
+        if e is not None:
+            print(f"  ERROR {record['type']} {e}", file=sys.stderr)
+            stats["errors"] += 1
+            continue
+        yield asset
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("batch_file")
+    parser.add_argument("shard_file")
+    parser.add_argument("--start-byte", type=int, default=0)
+    parser.add_argument("--end-byte", type=int, default=None)
+    args = parser.parse_args()
+
+    end = args.end_byte
+    if end is None:
+        end = os.path.getsize(args.batch_file)
+
+    stats = {"items": 0, "errors": 0}
+    count, _ = write_feed(args.shard_file, None,
+                          convert_range(args.batch_file, args.start_byte, end, stats),
+                          jsonl=True)
+    print(f"{args.shard_file}: bytes {args.start_byte}-{end}, "
+          f"{stats['items']} items, {count} assets, {stats['errors']} errors")
+
+
+if __name__ == "__main__":
+    main()